@@ -0,0 +1,135 @@
+import fs from 'fs';
+import path from 'path';
+
+// CLAUDE SKILL TREE - BINARY EVENT LOG
+// Append-only alternative to per-call usage_history writes.
+// Segments are loaded into SQLite later by `python manage.py ingest-log`.
+//
+// Segment layout (little-endian, see event_log.py for the reader):
+//   header  'SKEV' magic, u16 version, u16 record size
+//   record  i64 timestamp_ms, u32 context_id, u32 tool_id, u8 success, 3 pad, i32 xp
+// Context and tool names are interned in strings.txt, one per line, id = line number.
+// Segments are numbered by the time they were opened, so names stay unique
+// after ingest-log deletes them.
+
+export const MAGIC = 'SKEV';
+export const VERSION = 1;
+export const HEADER_SIZE = 8;
+export const RECORD_SIZE = 24;
+
+export class EventLog {
+  constructor(dir, maxBytes = 16 * 1024 * 1024, rotateMs = 60 * 60 * 1000) {
+    this.dir = dir;
+    this.maxBytes = maxBytes;
+    this.rotateMs = rotateMs;
+    this.timer = null;
+    this.fd = null;
+    this.offset = 0;
+    this.segment = 0;
+    this.strings = new Map();  // name -> interned id
+    this.record = Buffer.alloc(RECORD_SIZE);
+  }
+
+  open() {
+    fs.mkdirSync(this.dir, { recursive: true });
+
+    // Reload the interned string table so ids stay stable across restarts
+    const stringsPath = path.join(this.dir, 'strings.txt');
+    if (fs.existsSync(stringsPath)) {
+      const contents = fs.readFileSync(stringsPath);
+      // Drop a partial last name left by a crash, so the next intern()
+      // starts on its own line and ids match event_log.load_strings
+      const end = contents.lastIndexOf(0x0a) + 1;
+      if (end < contents.length) {
+        fs.truncateSync(stringsPath, end);
+      }
+      const names = contents.subarray(0, end).toString('utf8').split('\n');
+      names.pop();  // trailing newline
+      names.forEach((name, id) => this.strings.set(name, id));
+    }
+
+    // Start a fresh segment so the previous run's is sealed for ingest-log,
+    // reusing it only if it never got a record
+    let newest = -1;
+    let resumable = false;
+    for (const file of fs.readdirSync(this.dir)) {
+      const match = /^events-(\d+)\.(bin|ingested)$/.exec(file);
+      if (match && parseInt(match[1], 10) >= newest) {
+        newest = parseInt(match[1], 10);
+        resumable = match[2] === 'bin' &&
+          fs.statSync(path.join(this.dir, file)).size <= HEADER_SIZE;
+      }
+    }
+    this.openSegment(resumable ? newest : Math.max(newest + 1, Date.now()));
+
+    // Seal segments on a timer too, so a quiet proxy still feeds ingest-log
+    this.timer = setInterval(() => {
+      if (this.offset > HEADER_SIZE) {
+        this.rotate();
+      }
+    }, this.rotateMs);
+    this.timer.unref();
+  }
+
+  segmentPath(segment) {
+    return path.join(this.dir, `events-${String(segment).padStart(13, '0')}.bin`);
+  }
+
+  openSegment(segment) {
+    this.segment = segment;
+    this.fd = fs.openSync(this.segmentPath(segment), 'a');
+    this.offset = fs.fstatSync(this.fd).size;
+
+    if (this.offset === 0) {
+      const header = Buffer.alloc(HEADER_SIZE);
+      header.write(MAGIC, 0, 'ascii');
+      header.writeUInt16LE(VERSION, 4);
+      header.writeUInt16LE(RECORD_SIZE, 6);
+      fs.writeSync(this.fd, header);
+      this.offset = HEADER_SIZE;
+    }
+  }
+
+  rotate() {
+    fs.closeSync(this.fd);
+    this.openSegment(Math.max(this.segment + 1, Date.now()));
+  }
+
+  intern(name) {
+    // One name per line; readers split on \n only
+    name = name.replace(/[\r\n]/g, ' ');
+    let id = this.strings.get(name);
+    if (id === undefined) {
+      id = this.strings.size;
+      // Written before any record refers to it, so readers never see a dangling id
+      fs.appendFileSync(path.join(this.dir, 'strings.txt'), `${name}\n`);
+      this.strings.set(name, id);
+    }
+    return id;
+  }
+
+  append({ context, toolName, success, xp }) {
+    const record = this.record;
+    record.writeBigInt64LE(BigInt(Date.now()), 0);
+    record.writeUInt32LE(this.intern(context), 8);
+    record.writeUInt32LE(this.intern(toolName), 12);
+    record.writeUInt8(success ? 1 : 0, 16);
+    record.fill(0, 17, 20);
+    record.writeInt32LE(xp, 20);
+
+    fs.writeSync(this.fd, record);
+    this.offset += RECORD_SIZE;
+
+    if (this.offset >= this.maxBytes) {
+      this.rotate();
+    }
+  }
+
+  close() {
+    clearInterval(this.timer);
+    if (this.fd !== null) {
+      fs.closeSync(this.fd);
+      this.fd = null;
+    }
+  }
+}
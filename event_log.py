@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Claude Skill Tree Event Log Reader
+Zero-copy access to the binary event log written by event-log.js
+"""
+
+import mmap
+import struct
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+MAGIC = b"SKEV"
+VERSION = 1
+
+# magic, version, record size
+HEADER = struct.Struct("<4sHH")
+# timestamp_ms, context_id, tool_id, success, xp
+RECORD = struct.Struct("<qIIB3xi")
+
+Record = Tuple[int, int, int, int, int]
+
+
+def load_strings(log_dir: Path) -> List[str]:
+    """Load the interned string table, indexed by id"""
+    strings_path = Path(log_dir) / "strings.txt"
+    if not strings_path.exists():
+        return []
+    # Split on \n only, as the writer does; universal newlines would shift ids
+    return strings_path.read_bytes().decode("utf-8").split("\n")[:-1]
+
+
+def segments(log_dir: Path) -> List[Path]:
+    """List segment files, oldest first (the last one may still be written to)"""
+    return sorted(Path(log_dir).glob("events-*.bin"))
+
+
+@contextmanager
+def open_segment(path: Path) -> Iterator[memoryview]:
+    """Map a segment and yield a memoryview over its complete records"""
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        if size < HEADER.size:
+            yield memoryview(b"")
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            magic, version, record_size = HEADER.unpack_from(mapped)
+            if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                raise ValueError(f"{path} is not a version {VERSION} event log segment")
+
+            # Ignore a trailing partial record left by an interrupted write
+            count = (size - HEADER.size) // RECORD.size
+            view = memoryview(mapped)[HEADER.size:HEADER.size + count * RECORD.size]
+            try:
+                yield view
+            finally:
+                view.release()
+
+
+def iter_records(path: Path) -> Iterator[Record]:
+    """Yield (timestamp_ms, context_id, tool_id, success, xp) for each record"""
+    with open_segment(path) as view:
+        yield from RECORD.iter_unpack(view)
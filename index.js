@@ -4,12 +4,22 @@ import sqlite3 from 'sqlite3';
 import { open } from 'sqlite';
 import path from 'path';
 import { fileURLToPath } from 'url';
+import { XPLeaderboard, WINDOWS } from './leaderboard.js';
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
 
+// SQLite CURRENT_TIMESTAMP text (UTC) to epoch milliseconds
+function parseTimestamp(timestamp) {
+  const parsed = Date.parse(`${String(timestamp).replace(' ', 'T')}Z`);
+  return Number.isNaN(parsed) ? Date.now() : parsed;
+}
+
 class ClaudeSkillTree {
   constructor() {
     this.db = null;
+    this.leaderboard = new XPLeaderboard();
+    this.lastHistoryId = 0;  // Newest usage_history row applied to the leaderboard
+    this.leaderboardSync = Promise.resolve();
     this.server = new Server({
       name: 'claude-skill-tree',
       version: '1.0.0',
@@ -28,6 +38,7 @@ class ClaudeSkillTree {
 
     await this.createTables();
     await this.loadSkillDefinitions();
+    await this.loadLeaderboard();
     this.setupHandlers();
   }
 
@@ -62,6 +73,23 @@ class ClaudeSkillTree {
       )
     `);
 
+    // Knowledge graph adjacency - built offline by `manage.py link`
+    await this.db.exec(`
+      CREATE TABLE IF NOT EXISTS knowledge_edges (
+        source_id INTEGER NOT NULL,
+        target_id INTEGER NOT NULL,
+        weight REAL DEFAULT 1,
+        kind TEXT,
+        PRIMARY KEY (source_id, target_id),
+        FOREIGN KEY (source_id) REFERENCES context_knowledge(id),
+        FOREIGN KEY (target_id) REFERENCES context_knowledge(id)
+      ) WITHOUT ROWID
+    `);
+    await this.db.exec(`
+      CREATE INDEX IF NOT EXISTS idx_knowledge_edges_target
+      ON knowledge_edges(target_id)
+    `);
+
     // Ontology entries - the WHY
     await this.db.exec(`
       CREATE TABLE IF NOT EXISTS ontology (
@@ -89,6 +117,16 @@ class ClaudeSkillTree {
       )
     `);
 
+    // Cold-path indexes for leaderboard queries (see `manage.py leaderboard`)
+    await this.db.exec(`
+      CREATE INDEX IF NOT EXISTS idx_skills_total_xp
+      ON skills(total_xp DESC)
+    `);
+    await this.db.exec(`
+      CREATE INDEX IF NOT EXISTS idx_usage_history_window
+      ON usage_history(timestamp, skill_id, xp_gained)
+    `);
+
     // Initialize ontology with core purpose
     await this.db.run(`
       INSERT OR IGNORE INTO ontology (entry_type, content, purpose, anti_pattern, override_behavior)
@@ -130,6 +168,60 @@ class ClaudeSkillTree {
     }
   }
 
+  async loadLeaderboard() {
+    // One read transaction, so the totals and the history high-water mark
+    // agree; later usage_history rows are applied by syncLeaderboard()
+    await this.db.exec('BEGIN');
+    try {
+      const { last_id } = await this.db.get('SELECT COALESCE(MAX(id), 0) as last_id FROM usage_history');
+      const skills = await this.db.all('SELECT context, skill_name, total_xp FROM skills');
+      this.leaderboard.loadTotals(skills);
+
+      const longest = Math.max(...Object.values(WINDOWS).map(w => w.span)) / 1000;
+      const recent = await this.db.all(`
+        SELECT s.context, s.skill_name, u.timestamp, u.xp_gained
+        FROM usage_history u
+        JOIN skills s ON s.id = u.skill_id
+        WHERE u.timestamp > datetime('now', ?) AND u.id <= ?
+        ORDER BY u.timestamp
+      `, [`-${longest} seconds`, last_id]);
+      for (const row of recent) {
+        // Lifetime totals already include this XP; only the windows need it
+        this.leaderboard.recordWindows(row.context, row.skill_name, row.xp_gained, parseTimestamp(row.timestamp));
+      }
+      this.lastHistoryId = last_id;
+    } finally {
+      await this.db.exec('COMMIT');
+    }
+  }
+
+  syncLeaderboard() {
+    // Serialized, so overlapping callers never apply the same rows twice;
+    // a failed sync is retried by the next one rather than blocking it
+    this.leaderboardSync = this.leaderboardSync
+      .catch(() => {})
+      .then(() => this.applyNewHistory());
+    return this.leaderboardSync;
+  }
+
+  async applyNewHistory() {
+    // Every XP change - ours, the proxy's, ingest-log's and manage.py's - is
+    // logged to usage_history, so new rows are exactly the deltas to apply
+    const rows = await this.db.all(`
+      SELECT u.id, s.context, s.skill_name, u.timestamp, u.xp_gained
+      FROM usage_history u
+      LEFT JOIN skills s ON s.id = u.skill_id
+      WHERE u.id > ?
+      ORDER BY u.id
+    `, [this.lastHistoryId]);
+    for (const row of rows) {
+      if (row.skill_name !== null && row.xp_gained) {
+        this.leaderboard.record(row.context, row.skill_name, row.xp_gained, parseTimestamp(row.timestamp));
+      }
+      this.lastHistoryId = row.id;
+    }
+  }
+
   setupHandlers() {
     // ACTUAL TOOLS I CAN USE
     this.server.setRequestHandler('tools/list', async () => {
@@ -269,6 +361,25 @@ class ClaudeSkillTree {
               required: ['source_mcp', 'context', 'data']
             }
           },
+          {
+            name: 'skill_tree_leaderboard',
+            description: 'Top skills by XP, all time or within a recent window',
+            inputSchema: {
+              type: 'object',
+              properties: {
+                window: {
+                  type: 'string',
+                  enum: ['1h', '1d', '7d', 'all'],
+                  default: 'all'
+                },
+                top: {
+                  type: 'integer',
+                  minimum: 1,
+                  default: 5
+                }
+              }
+            }
+          },
           {
             name: 'skill_tree_status',
             description: 'Get overall skill tree status',
@@ -307,6 +418,9 @@ class ClaudeSkillTree {
         case 'skill_tree_sync_third_party':
           return await this.syncThirdParty(args);
         
+        case 'skill_tree_leaderboard':
+          return await this.getLeaderboard(args);
+        
         case 'skill_tree_status':
           return await this.getStatus();
         
@@ -353,6 +467,14 @@ class ClaudeSkillTree {
           last_used = CURRENT_TIMESTAMP
       WHERE context = ?
     `, [context]);
+    // 'xp:' rows only carry XP, so manage.py doesn't count them as tool uses
+    await this.db.run(`
+      INSERT INTO usage_history (skill_id, tool_name, success, context_data, xp_gained)
+      SELECT id, 'xp:skill_tree_add_knowledge', 1, ?, 5
+      FROM skills
+      WHERE context = ?
+    `, [knowledge_type, context]);
+    await this.syncLeaderboard();
 
     return {
       content: [{
@@ -406,6 +528,13 @@ class ClaudeSkillTree {
       SELECT * FROM skills 
       WHERE context = ? AND skill_name = ?
     `, [context, skill_name]);
+    if (skill) {
+      await this.db.run(`
+        INSERT INTO usage_history (skill_id, tool_name, success, context_data, xp_gained)
+        VALUES (?, 'xp:skill_tree_gain_xp', 1, ?, ?)
+      `, [skill.id, reason || null, xp_amount]);
+      await this.syncLeaderboard();
+    }
 
     const newLevel = Math.floor(skill.total_xp / 100);
     const levelUp = newLevel > skill.current_level;
@@ -481,6 +610,13 @@ class ClaudeSkillTree {
       SET total_xp = total_xp + 50
       WHERE context = 'ontology' AND skill_name = 'self_awareness'
     `);
+    await this.db.run(`
+      INSERT INTO usage_history (skill_id, tool_name, success, context_data, xp_gained)
+      SELECT id, 'xp:skill_tree_add_ontology', 1, ?, 50
+      FROM skills
+      WHERE context = 'ontology' AND skill_name = 'self_awareness'
+    `, [entry_type]);
+    await this.syncLeaderboard();
 
     return {
       content: [{
@@ -538,6 +674,24 @@ class ClaudeSkillTree {
     };
   }
 
+  async getLeaderboard(args) {
+    const { window, top } = args || {};
+    const windowName = window || 'all';
+
+    await this.syncLeaderboard();
+    const skills = this.leaderboard.top(windowName, top || 5);
+
+    return {
+      content: [{
+        type: 'text',
+        text: `🏆 LEADERBOARD (${windowName})\n\n` +
+              (skills.length > 0
+                ? skills.map((s, i) => `${i + 1}. ${s.skill_name} (${s.context}): ${s.xp} XP`).join('\n')
+                : 'No XP gained in this window yet')
+      }]
+    };
+  }
+
   async start() {
     const transport = new StdioServerTransport();
     await this.server.connect(transport);
@@ -57,6 +57,23 @@ async function initializeDatabase() {
   `);
   console.log('  ✓ context_knowledge table');
 
+  await db.exec(`
+    CREATE TABLE IF NOT EXISTS knowledge_edges (
+      source_id INTEGER NOT NULL,
+      target_id INTEGER NOT NULL,
+      weight REAL DEFAULT 1,
+      kind TEXT,
+      PRIMARY KEY (source_id, target_id),
+      FOREIGN KEY (source_id) REFERENCES context_knowledge(id),
+      FOREIGN KEY (target_id) REFERENCES context_knowledge(id)
+    ) WITHOUT ROWID
+  `);
+  await db.exec(`
+    CREATE INDEX IF NOT EXISTS idx_knowledge_edges_target
+    ON knowledge_edges(target_id)
+  `);
+  console.log('  ✓ knowledge_edges table');
+
   await db.exec(`
     CREATE TABLE IF NOT EXISTS ontology (
       id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -84,6 +101,16 @@ async function initializeDatabase() {
   `);
   console.log('  ✓ usage_history table');
 
+  await db.exec(`
+    CREATE INDEX IF NOT EXISTS idx_skills_total_xp
+    ON skills(total_xp DESC)
+  `);
+  await db.exec(`
+    CREATE INDEX IF NOT EXISTS idx_usage_history_window
+    ON usage_history(timestamp, skill_id, xp_gained)
+  `);
+  console.log('  ✓ leaderboard indexes');
+
   // Initialize core ontology entries
   console.log('\n🧠 Initializing Ontology...');
 
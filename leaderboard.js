@@ -0,0 +1,169 @@
+// CLAUDE SKILL TREE - XP LEADERBOARD
+// In-memory top-N by XP, updated incrementally as XP is gained.
+// `all` ranks lifetime total_xp; the other windows rank XP gained recently,
+// kept in time buckets that are expired as the window slides.
+
+export const WINDOWS = {
+  '1h': { span: 60 * 60 * 1000, bucket: 60 * 1000 },
+  '1d': { span: 24 * 60 * 60 * 1000, bucket: 60 * 60 * 1000 },
+  '7d': { span: 7 * 24 * 60 * 60 * 1000, bucket: 60 * 60 * 1000 }
+};
+
+// Keys kept sorted by score (ties by key). An update binary-searches the
+// key's old and new slots and shifts only the keys in between
+export class RankedCounter {
+  constructor(dropEmpty = false) {
+    this.scores = new Map();      // key -> score
+    this.order = [];              // keys, highest score first
+    this.dropEmpty = dropEmpty;   // forget keys whose score falls to 0 (windows)
+  }
+
+  // Slot in order[lo, hi) at which `key` with `score` sits, or would be inserted
+  indexOf(key, score, lo = 0, hi = this.order.length) {
+    while (lo < hi) {
+      const mid = (lo + hi) >>> 1;
+      const other = this.order[mid];
+      const otherScore = this.scores.get(other);
+      if (otherScore > score || (otherScore === score && other < key)) {
+        lo = mid + 1;
+      } else {
+        hi = mid;
+      }
+    }
+    return lo;
+  }
+
+  add(key, delta) {
+    const order = this.order;
+    const previous = this.scores.get(key);
+    const score = (previous || 0) + delta;
+
+    if (previous === undefined) {
+      order.splice(this.indexOf(key, score), 0, key);
+      this.scores.set(key, score);
+      return;
+    }
+
+    const from = this.indexOf(key, previous);
+
+    // Keys that fell out of a window are dropped entirely
+    if (this.dropEmpty && score <= 0 && delta < 0) {
+      order.splice(from, 1);
+      this.scores.delete(key);
+      return;
+    }
+
+    if (delta > 0) {
+      const to = this.indexOf(key, score, 0, from);
+      for (let i = from; i > to; i--) {
+        order[i] = order[i - 1];
+      }
+      order[to] = key;
+    } else if (delta < 0) {
+      const to = this.indexOf(key, score, from + 1) - 1;
+      for (let i = from; i < to; i++) {
+        order[i] = order[i + 1];
+      }
+      order[to] = key;
+    }
+    this.scores.set(key, score);
+  }
+
+  // Replace all scores at once; one sort beats inserting keys one by one
+  load(entries) {
+    this.scores = new Map(entries);
+    this.order = entries.map(([key]) => key).sort((a, b) =>
+      this.scores.get(b) - this.scores.get(a) || (a < b ? -1 : a > b ? 1 : 0)
+    );
+  }
+
+  top(n) {
+    return this.order.slice(0, n).map(key => ({ key, xp: this.scores.get(key) }));
+  }
+}
+
+export class XPLeaderboard {
+  constructor() {
+    this.skills = new Map();    // key -> { context, skill_name }
+    this.all = new RankedCounter();
+    this.windows = {};
+    for (const [name, spec] of Object.entries(WINDOWS)) {
+      this.windows[name] = { ...spec, ranked: new RankedCounter(true), buckets: [] };
+    }
+  }
+
+  register(context, skill_name) {
+    const key = `${context}/${skill_name}`;
+    if (!this.skills.has(key)) {
+      this.skills.set(key, { context, skill_name });
+    }
+    return key;
+  }
+
+  // Seed lifetime XP from rows of the skills table at startup
+  loadTotals(skills) {
+    this.all.load(skills.map(({ context, skill_name, total_xp }) => [
+      this.register(context, skill_name),
+      total_xp
+    ]));
+  }
+
+  record(context, skill_name, xp, timestamp = Date.now()) {
+    this.all.add(this.register(context, skill_name), xp);
+    this.recordWindows(context, skill_name, xp, timestamp);
+  }
+
+  // Windowed XP only, for replaying history already counted in the totals
+  recordWindows(context, skill_name, xp, timestamp = Date.now()) {
+    // Windows rank XP gained: zero would list a skill that never expires
+    // out of the window, and deductions (resets) are not gains
+    if (!(xp > 0)) {
+      return;
+    }
+    const key = this.register(context, skill_name);
+    for (const window of Object.values(this.windows)) {
+      this.expire(window, Date.now());
+      if (timestamp <= Date.now() - window.span) {
+        continue;
+      }
+
+      const start = Math.floor(timestamp / window.bucket) * window.bucket;
+      let i = window.buckets.length - 1;
+      while (i >= 0 && window.buckets[i].start > start) {
+        i--;
+      }
+      if (i < 0 || window.buckets[i].start !== start) {
+        window.buckets.splice(i + 1, 0, { start, xp: new Map() });
+        i++;
+      }
+
+      const bucket = window.buckets[i].xp;
+      bucket.set(key, (bucket.get(key) || 0) + xp);
+      window.ranked.add(key, xp);
+    }
+  }
+
+  // Drop buckets that lie entirely outside the window, so windows are
+  // accurate to one bucket (1 minute for 1h, 1 hour for 1d and 7d)
+  expire(window, now) {
+    while (window.buckets.length > 0 && window.buckets[0].start + window.bucket <= now - window.span) {
+      for (const [key, xp] of window.buckets.shift().xp) {
+        window.ranked.add(key, -xp);
+      }
+    }
+  }
+
+  top(windowName = 'all', n = 5) {
+    let ranked = this.all;
+    if (windowName !== 'all') {
+      const window = this.windows[windowName];
+      if (!window) {
+        throw new Error(`Unknown leaderboard window: ${windowName}`);
+      }
+      this.expire(window, Date.now());
+      ranked = window.ranked;
+    }
+
+    return ranked.top(n).map(({ key, xp }) => ({ ...this.skills.get(key), xp }));
+  }
+}
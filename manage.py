@@ -5,17 +5,40 @@ Utility for managing and viewing skill progression
 """
 
 import json
+import math
+import heapq
+import re
 import sqlite3
 import sys
+from collections import defaultdict
+from itertools import combinations
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, List, Optional
 
+import event_log
+
+# Leaderboard windows as SQLite datetime modifiers
+LEADERBOARD_WINDOWS = {
+    '1h': '-1 hour',
+    '1d': '-1 day',
+    '7d': '-7 days',
+    'all': None
+}
+
+# Words too common to say anything about how two knowledge entries relate
+STOPWORDS = {
+    'the', 'and', 'for', 'with', 'that', 'this', 'from', 'are', 'was', 'not',
+    'but', 'about', 'into', 'over', 'than', 'then', 'its', 'has', 'have',
+    'key', 'value', 'data'
+}
+
 class SkillTreeManager:
     def __init__(self, db_path: str = "data/skill_tree.db"):
         """Initialize the skill tree manager"""
         self.db_path = Path(db_path)
         self.conn = None
+        self.knowledge_edges_ready = False
         
     def connect(self):
         """Connect to the skill database"""
@@ -56,11 +79,12 @@ class SkillTreeManager:
         """)
         stats['top_skills'] = [dict(row) for row in cursor.fetchall()]
         
-        # Recent activity
+        # Recent activity ('xp:' rows only carry XP, they aren't tool uses)
         cursor.execute("""
             SELECT COUNT(*) as recent_uses
             FROM usage_history
             WHERE timestamp > datetime('now', '-1 day')
+              AND tool_name NOT LIKE 'xp:%'
         """)
         stats['recent_activity'] = cursor.fetchone()['recent_uses']
         
@@ -118,6 +142,13 @@ class SkillTreeManager:
                 last_used = datetime('now')
             WHERE skill_name = ?
         """, (xp, skill_name))
+        # Logged so the server's leaderboard picks the change up
+        cursor.execute("""
+            INSERT INTO usage_history (skill_id, tool_name, success, xp_gained)
+            SELECT id, 'xp:manage_add_xp', 1, ?
+            FROM skills
+            WHERE skill_name = ?
+        """, (xp, skill_name))
         
         # Check for level up
         cursor.execute("""
@@ -149,6 +180,13 @@ class SkillTreeManager:
     def reset_skill(self, skill_name: str):
         """Reset a skill to level 0"""
         cursor = self.conn.cursor()
+        # Logged as a deduction so the server's leaderboard picks the change up
+        cursor.execute("""
+            INSERT INTO usage_history (skill_id, tool_name, success, xp_gained)
+            SELECT id, 'xp:manage_reset', 1, -total_xp
+            FROM skills
+            WHERE skill_name = ? AND total_xp != 0
+        """, (skill_name,))
         cursor.execute("""
             UPDATE skills
             SET current_level = 0, total_xp = 0, usage_count = 0
@@ -157,6 +195,275 @@ class SkillTreeManager:
         self.conn.commit()
         print(f"Reset {skill_name} to level 0")
     
+    def ensure_knowledge_edges(self):
+        """Create the knowledge graph edge table if the database predates it"""
+        if self.knowledge_edges_ready:
+            return
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS knowledge_edges (
+                source_id INTEGER NOT NULL,
+                target_id INTEGER NOT NULL,
+                weight REAL DEFAULT 1,
+                kind TEXT,
+                PRIMARY KEY (source_id, target_id),
+                FOREIGN KEY (source_id) REFERENCES context_knowledge(id),
+                FOREIGN KEY (target_id) REFERENCES context_knowledge(id)
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_knowledge_edges_target
+            ON knowledge_edges(target_id)
+        """)
+        self.knowledge_edges_ready = True
+    
+    def related(self, knowledge_id: int, depth: int = 2) -> List[Dict]:
+        """Get knowledge within `depth` hops of an entry, nearest and strongest first"""
+        self.ensure_knowledge_edges()
+        cursor = self.conn.cursor()
+        
+        # An entry's weight is the sum of its edges from the previous hop.
+        # Scoring every (entry, depth) the walk reached and keeping each
+        # entry's shallowest row avoids a self-join on the walk: any source
+        # one hop above an entry's shallowest depth must itself be at its own
+        # shallowest depth, or the entry would have been reached sooner
+        cursor.execute("""
+            WITH RECURSIVE walk(id, depth) AS (
+                SELECT ?, 0
+                UNION
+                SELECT e.target_id, walk.depth + 1
+                FROM knowledge_edges e
+                JOIN walk ON e.source_id = walk.id
+                WHERE walk.depth < ?
+            ),
+            scored AS (
+                SELECT e.target_id as id, walk.depth + 1 as depth, SUM(e.weight) as weight
+                FROM walk
+                JOIN knowledge_edges e ON e.source_id = walk.id
+                WHERE walk.depth < ?
+                GROUP BY e.target_id, walk.depth
+            ),
+            nearest AS (
+                -- SQLite takes bare columns from the row holding the MIN()
+                SELECT id, MIN(depth) as depth, weight
+                FROM scored
+                WHERE id != ?
+                GROUP BY id
+            )
+            SELECT
+                k.id,
+                k.context,
+                k.knowledge_type,
+                k.content,
+                k.importance,
+                n.depth,
+                n.weight
+            FROM nearest n
+            JOIN context_knowledge k ON k.id = n.id
+            ORDER BY n.depth, n.weight DESC, k.importance DESC
+        """, (knowledge_id, depth, depth, knowledge_id))
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def build_links(self, max_df: float = 0.02, max_neighbors: int = 10) -> int:
+        """Rebuild knowledge_edges from terms shared between entries"""
+        self.ensure_knowledge_edges()
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id, content FROM context_knowledge")
+        rows = cursor.fetchall()
+        
+        # Inverted index: term -> ids of entries containing it. knowledge_type
+        # is left out: synced entries share one per source, linking them all
+        postings = defaultdict(set)
+        for row in rows:
+            for term in re.findall(r"[a-z0-9_]{3,}", row['content'].lower()):
+                if term not in STOPWORDS:
+                    postings[term].add(row['id'])
+        
+        # Terms found in a single entry link nothing, terms found in many
+        # entries link everything; weight the rest by rarity (idf). The floor
+        # keeps small, hand-entered knowledge bases linkable
+        doc_count = len(rows)
+        weights = defaultdict(float)
+        for ids in postings.values():
+            if len(ids) < 2 or len(ids) > max(20, doc_count * max_df):
+                continue
+            idf = math.log(doc_count / len(ids))
+            for a, b in combinations(sorted(ids), 2):
+                weights[(a, b)] += idf
+        
+        # Keep only each entry's strongest neighbors so a hop stays small,
+        # storing every kept pair in both directions for related()
+        neighbors = defaultdict(list)
+        for (a, b), weight in weights.items():
+            neighbors[a].append((weight, b))
+            neighbors[b].append((weight, a))
+        
+        kept = {}
+        for source, candidates in neighbors.items():
+            for weight, target in heapq.nlargest(max_neighbors, candidates):
+                kept[(min(source, target), max(source, target))] = weight
+        
+        edges = []
+        for (a, b), weight in kept.items():
+            edges.append((a, b, weight, 'shared_terms'))
+            edges.append((b, a, weight, 'shared_terms'))
+        
+        # Edges of other kinds take precedence over inferred ones
+        cursor.execute("DELETE FROM knowledge_edges WHERE kind = 'shared_terms'")
+        cursor.executemany("""
+            INSERT OR IGNORE INTO knowledge_edges (source_id, target_id, weight, kind)
+            VALUES (?, ?, ?, ?)
+        """, edges)
+        self.conn.commit()
+        print(f"Linked {len(edges)} edges across {doc_count} entries")
+        return len(edges)
+    
+    def ingest_event_log(self, log_dir: Optional[str] = None, include_active: bool = False,
+                         keep: bool = False) -> int:
+        """Bulk-load binary event log segments into usage_history and skills"""
+        log_dir = Path(log_dir) if log_dir else self.db_path.parent / "events"
+        segments = event_log.segments(log_dir)
+        if not include_active:
+            # The newest segment may still be appended to by the proxy
+            segments = segments[:-1]
+        
+        strings = event_log.load_strings(log_dir)
+        cursor = self.conn.cursor()
+        
+        # Segments are recorded in the same transaction as their events, so
+        # one whose removal failed is never loaded twice
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ingested_segments (
+                name TEXT PRIMARY KEY,
+                events INTEGER,
+                ingested_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("SELECT name FROM ingested_segments")
+        done = {row['name'] for row in cursor.fetchall()}
+        
+        cursor.execute("""
+            SELECT 1 FROM sqlite_master
+            WHERE type = 'table' AND name = 'specializations'
+        """)
+        has_specializations = cursor.fetchone() is not None
+        
+        cursor.execute("SELECT id, context FROM skills")
+        skills_by_context = defaultdict(list)
+        for row in cursor.fetchall():
+            skills_by_context[row['context']].append(row['id'])
+        
+        ingested = 0
+        for segment in segments:
+            if segment.name in done:
+                self.retire_segment(segment, keep)
+                continue
+            
+            count = 0
+            history = []
+            totals = defaultdict(lambda: [0, 0, ''])  # context -> xp, uses, last_used
+            for timestamp_ms, context_id, tool_id, success, xp in event_log.iter_records(segment):
+                context = strings[context_id]
+                timestamp = datetime.fromtimestamp(
+                    timestamp_ms / 1000, timezone.utc
+                ).strftime('%Y-%m-%d %H:%M:%S')
+                
+                # The proxy credits every skill in the tool's context; only
+                # the first row counts as the tool use, the rest carry XP
+                tool_name = strings[tool_id]
+                for i, skill_id in enumerate(skills_by_context[context]):
+                    name = tool_name if i == 0 else f"xp:{tool_name}"
+                    history.append((skill_id, timestamp, name, success, xp))
+                
+                total = totals[context]
+                total[0] += xp
+                total[1] += 1
+                total[2] = max(total[2], timestamp)
+                count += 1
+            
+            cursor.executemany("""
+                INSERT INTO usage_history (skill_id, timestamp, tool_name, success, xp_gained)
+                VALUES (?, ?, ?, ?, ?)
+            """, history)
+            cursor.executemany("""
+                UPDATE skills
+                SET total_xp = total_xp + ?,
+                    usage_count = usage_count + ?,
+                    last_used = MAX(COALESCE(last_used, ''), ?),
+                    current_level = MAX(current_level, (total_xp + ?) / 100)
+                WHERE context = ?
+            """, [(xp, uses, last_used, xp, context)
+                  for context, (xp, uses, last_used) in totals.items()])
+            
+            if has_specializations:
+                cursor.executemany("""
+                    UPDATE specializations
+                    SET unlocked = 1, unlock_date = datetime('now')
+                    WHERE unlocked = 0
+                      AND skill_id IN (SELECT id FROM skills WHERE context = ?)
+                      AND level_required <= (
+                          SELECT current_level FROM skills WHERE id = specializations.skill_id
+                      )
+                """, [(context,) for context in totals])
+            
+            cursor.execute("""
+                INSERT INTO ingested_segments (name, events)
+                VALUES (?, ?)
+            """, (segment.name, count))
+            self.conn.commit()
+            ingested += count
+            
+            self.retire_segment(segment, keep)
+        
+        print(f"Ingested {ingested} events from {len(segments)} segments")
+        return ingested
+    
+    def retire_segment(self, segment: Path, keep: bool):
+        """Delete an ingested segment, or set it aside with keep"""
+        if keep:
+            segment.rename(segment.with_suffix('.ingested'))
+        else:
+            segment.unlink()
+    
+    def ensure_leaderboard_indexes(self):
+        """Create the indexes that keep leaderboard queries off full scans"""
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_skills_total_xp
+            ON skills(total_xp DESC)
+        """)
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_usage_history_window
+            ON usage_history(timestamp, skill_id, xp_gained)
+        """)
+    
+    def get_leaderboard(self, window: str = 'all', top: int = 5) -> List[Dict]:
+        """Get the top skills by lifetime XP, or by XP gained within a window"""
+        if window not in LEADERBOARD_WINDOWS:
+            raise ValueError(f"Unknown window '{window}', expected one of {list(LEADERBOARD_WINDOWS)}")
+        
+        self.ensure_leaderboard_indexes()
+        cursor = self.conn.cursor()
+        if window == 'all':
+            cursor.execute("""
+                SELECT context, skill_name, total_xp as xp
+                FROM skills
+                ORDER BY total_xp DESC
+                LIMIT ?
+            """, (top,))
+        else:
+            cursor.execute("""
+                SELECT s.context, s.skill_name, w.xp
+                FROM (
+                    SELECT skill_id, SUM(xp_gained) as xp
+                    FROM usage_history
+                    WHERE timestamp > datetime('now', ?) AND xp_gained > 0
+                    GROUP BY skill_id
+                ) w
+                JOIN skills s ON s.id = w.skill_id
+                ORDER BY w.xp DESC
+                LIMIT ?
+            """, (LEADERBOARD_WINDOWS[window], top))
+        return [dict(row) for row in cursor.fetchall()]
+    
     def display_stats(self):
         """Display current skill statistics"""
         stats = self.get_skill_stats()
@@ -184,6 +491,27 @@ class SkillTreeManager:
                 print(f"  • {spec['specialization_name']} ({spec['skill_name']})")
                 print(f"    {spec['description']}")
     
+    def display_related(self, knowledge_id: int, depth: int = 2):
+        """Display the knowledge neighborhood of an entry"""
+        related = self.related(knowledge_id, depth)
+        
+        print(f"\nKnowledge related to #{knowledge_id} (depth {depth}):")
+        if not related:
+            print("  None found - run 'python manage.py link' to build edges")
+        for entry in related:
+            print(f"  [{entry['depth']}] #{entry['id']} ({entry['context']}) "
+                  f"{entry['knowledge_type']}: {entry['content'][:60]}")
+    
+    def display_leaderboard(self, window: str = 'all', top: int = 5):
+        """Display the top skills for a window"""
+        leaders = self.get_leaderboard(window, top)
+        
+        print(f"\nLeaderboard ({window}):")
+        if not leaders:
+            print("  No XP gained in this window yet")
+        for rank, skill in enumerate(leaders, 1):
+            print(f"  {rank:>2}. {skill['skill_name']:<25} ({skill['context']}) {skill['xp']} XP")
+    
     def display_tree(self):
         """Display the skill tree structure"""
         tree = self.get_skill_tree()
@@ -243,12 +571,35 @@ def main():
         elif command == "reset" and len(sys.argv) == 3:
             skill = sys.argv[2]
             manager.reset_skill(skill)
+        elif command == "ingest-log":
+            include_active = "--all" in sys.argv[2:]
+            keep = "--keep" in sys.argv[2:]
+            paths = [arg for arg in sys.argv[2:] if arg not in ("--all", "--keep")]
+            manager.ingest_event_log(paths[0] if paths else None, include_active, keep)
+        elif command == "leaderboard":
+            args = sys.argv[2:]
+            window = args[args.index("--window") + 1] if "--window" in args else "all"
+            top = int(args[args.index("--top") + 1]) if "--top" in args else 5
+            if window not in LEADERBOARD_WINDOWS:
+                print(f"Unknown window '{window}' - use one of: {', '.join(LEADERBOARD_WINDOWS)}")
+                return 1
+            manager.display_leaderboard(window, top)
+        elif command == "link":
+            manager.build_links()
+        elif command == "related" and len(sys.argv) in (3, 4):
+            knowledge_id = int(sys.argv[2])
+            depth = int(sys.argv[3]) if len(sys.argv) == 4 else 2
+            manager.display_related(knowledge_id, depth)
         else:
             print("Usage:")
             print("  python manage.py stats     - Show statistics")
             print("  python manage.py tree      - Show skill tree")
             print("  python manage.py add-xp <skill> <amount>  - Add XP")
             print("  python manage.py reset <skill>  - Reset skill")
+            print("  python manage.py ingest-log [dir] [--all] [--keep]  - Load event log into database")
+            print("  python manage.py leaderboard [--window 1h|1d|7d|all] [--top N]  - Show top skills")
+            print("  python manage.py link      - Build knowledge graph edges")
+            print("  python manage.py related <id> [depth]  - Show related knowledge")
     else:
         # Default: show both stats and tree
         manager.display_stats()
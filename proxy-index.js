@@ -3,6 +3,7 @@ import { StdioServerTransport } from '@modelcontextprotocol/sdk/server/stdio.js'
 import { spawn } from 'child_process';
 import sqlite3 from 'sqlite3';
 import { open } from 'sqlite';
+import { EventLog } from './event-log.js';
 
 // CLAUDE SKILL TREE - META-MCP PROXY
 // Intercepts ALL tool calls, tracks XP, forwards to real servers
@@ -12,6 +13,7 @@ class SkillTreeProxy {
     this.db = null;
     this.realServers = new Map();  // Real MCP connections
     this.toolMap = new Map();      // tool_name -> server mapping
+    this.eventLog = null;          // Optional binary sink replacing per-call DB writes
     this.server = new Server({
       name: 'claude-skill-tree-proxy',
       version: '2.0.0'
@@ -28,6 +30,16 @@ class SkillTreeProxy {
       driver: sqlite3.Database
     });
 
+    // Append usage to the binary event log instead of SQLite when configured
+    if (process.env.EVENT_LOG_DIR) {
+      this.eventLog = new EventLog(
+        process.env.EVENT_LOG_DIR,
+        parseInt(process.env.EVENT_LOG_MAX_BYTES || '', 10) || undefined,
+        (parseInt(process.env.EVENT_LOG_ROTATE_SECONDS || '', 10) * 1000) || undefined
+      );
+      this.eventLog.open();
+    }
+
     // Connect to each real MCP server
     for (const [name, serverConfig] of Object.entries(config)) {
       await this.connectToServer(name, serverConfig);
@@ -73,14 +85,24 @@ class SkillTreeProxy {
       const { name: toolName, arguments: args } = request.params;
       
       // TRACK SKILL USAGE - THE MAGIC HAPPENS HERE
-      await this.trackSkillUsage(toolName, args);
+      if (!this.eventLog) {
+        await this.trackSkillUsage(toolName, args);
+      }
       
       // Forward to real server
       const serverName = this.toolMap.get(toolName);
       const server = this.realServers.get(serverName);
       
-      // Call the real tool
-      const result = await this.forwardToolCall(server, toolName, args);
+      // Call the real tool. Event log records carry the outcome, so they're
+      // written once it is known, including when the call throws
+      let result;
+      try {
+        result = await this.forwardToolCall(server, toolName, args);
+      } finally {
+        if (this.eventLog) {
+          this.logSkillUsage(toolName, Boolean(result && result.success));
+        }
+      }
       
       // Update XP based on success
       await this.updateXP(toolName, result.success);
@@ -93,15 +115,22 @@ class SkillTreeProxy {
     // Map tool to skill context
     const context = this.getContext(toolName);
     
-    // Log to database
-    await this.db.run(`
-      INSERT INTO usage_history (tool_name, context, timestamp)
-      VALUES (?, ?, datetime('now'))
-    `, [toolName, context]);
-    
     // Update skill XP
     const xpGained = process.env.HARVEY_MODE === 'true' ? 30 : 10;
     
+    // Log to database, one row per credited skill. Only the first counts as
+    // the tool use; the rest are 'xp:' rows that just carry XP
+    await this.db.run(`
+      INSERT INTO usage_history (skill_id, tool_name, timestamp, xp_gained)
+      SELECT
+        id,
+        CASE WHEN id = (SELECT MIN(id) FROM skills WHERE context = ?) THEN ? ELSE 'xp:' || ? END,
+        datetime('now'),
+        ?
+      FROM skills
+      WHERE context = ?
+    `, [context, toolName, toolName, xpGained, context]);
+    
     await this.db.run(`
       UPDATE skills 
       SET total_xp = total_xp + ?,
@@ -114,6 +143,16 @@ class SkillTreeProxy {
     await this.checkLevelUp(context);
   }
 
+  logSkillUsage(toolName, success) {
+    // Single append, no SQLite on the request path - see `manage.py ingest-log`
+    this.eventLog.append({
+      context: this.getContext(toolName),
+      toolName,
+      success,
+      xp: process.env.HARVEY_MODE === 'true' ? 30 : 10
+    });
+  }
+
   getContext(toolName) {
     // Map tools to contexts
     if (toolName.includes('memory')) return 'ontology';